@@ -26,6 +26,7 @@ class Compiler:
     def __init__(self) -> None:
         self.program = []
         self.pc = 0
+        self.source_map = []
 
     def compile_command(self, command: Command | int | str) -> None:
         self.program.append(command)
@@ -119,7 +120,9 @@ class Compiler:
 
     def compile_stmt(self, ast: tuple[Node]) -> None:
         for stmt in ast:
+            pc_start = self.pc
             self.compile_node(stmt)
+            self.source_map.append((pc_start, self.pc, stmt.start, stmt.end))
 
     def compile_program(self, ast: tuple[Node]) -> tuple[Command | int | str]:
         self.compile_stmt(ast)
@@ -33,13 +33,76 @@ class TokenEnum(str, Enum):
         return value in cls._value2member_map_
 
 
+class SourceSyntaxError(SyntaxError):
+    def __init__(self, msg: str, start: int | None = None, end: int | None = None, source: str | None = None) -> None:
+        super().__init__(msg)
+        self.msg = msg
+        self.start = start
+        self.end = end
+        self.source = source
+
+    @classmethod
+    def from_tokens(cls, msg: str, tokens: tuple["Token"]) -> "SourceSyntaxError":
+        if not tokens or tokens[0].pos is None:
+            return cls(msg)
+
+        return cls(msg, tokens[0].pos, tokens[-1].end)
+
+    def locate(self, tokens: tuple["Token"]) -> "SourceSyntaxError":
+        if self.start is None and tokens:
+            self.start = tokens[0].pos
+            self.end = tokens[-1].end
+        return self
+
+    @property
+    def span(self) -> str | None:
+        if self.source is None or self.start is None:
+            return None
+
+        return self.source[self.start : self.end]
+
+    @property
+    def position(self) -> tuple[int, int] | None:
+        if self.source is None or self.start is None:
+            return None
+
+        line = self.source.count("\n", 0, self.start) + 1
+        col = self.start - self.source.rfind("\n", 0, self.start)
+        return line, col
+
+    def __str__(self) -> str:
+        if self.start is None:
+            return self.msg
+
+        if (position := self.position) is None:
+            return f"{self.msg} at offset {self.start}"
+
+        span = self.span
+        if len(span) > 40:
+            span = span[:37] + "..."
+        span = " ".join(span.split())
+
+        return f"{self.msg} at {position[0]}:{position[1]}: {span}"
+
+    def __reduce__(self) -> tuple:
+        return type(self), (self.msg, self.start, self.end, self.source)
+
+
 class Token:
-    def __init__(self, token: TokenEnum, value: str | None = None) -> None:
+    def __init__(self, token: TokenEnum, value: str | None = None, pos: int | None = None) -> None:
         if not TokenEnum.has_value(token):
             raise TypeError("token must be a TokenEnum instance")
 
         self.token = token
         self.value = value
+        self.pos = pos
+
+    @property
+    def end(self) -> int | None:
+        if self.pos is None:
+            return None
+
+        return self.pos + len(str(self))
 
     def __str__(self) -> str:
         if self.token in (TokenEnum.VAR, TokenEnum.NUM):
@@ -66,45 +129,52 @@ class Token:
 
 
 class Lexer:
+    KEYWORD_EXPR = re.compile(r"(while|if)[ \t\n]*\(")
+    KEYWORD_STMTS = re.compile(r"(else)[ \t\n]*{")
+    KEYWORD_STMT = re.compile(r"(pass|exit)[ \t\n]*;")
+    VAR = re.compile(r"[a-zA-Z][a-zA-Z0-9_]*")
+    NUM = re.compile(r"[0-9]+")
+    OP = re.compile(r"(<|>|==|!=|\+|\-|\*|\/|\(|\)|=|;|{|})")
+
     @staticmethod
-    def tokenize(program: str) -> tuple[Token]:
+    def tokenize(program: str, errors: list[SourceSyntaxError] | None = None) -> tuple[Token]:
         pos = 0
         tokens = []
 
         while pos < len(program):
             if program[pos] in " \t\n":
                 pos += 1
-            elif re.search(r"^(while|if)[ \t\n]*\(", program[pos:]):
-                token = re.findall(r"^(while|if)[ \t\n]*\(", program[pos:])[0]
-                pos += len(token)
-                tokens.append(Token(token))
-            elif re.search(r"^(else)[ \t\n]*{", program[pos:]):
-                token = re.findall(r"^(else)[ \t\n]*{", program[pos:])[0]
-                pos += len(token)
-                tokens.append(Token(token))
-            elif re.search(r"^(pass|exit)[ \t\n]*;", program[pos:]):
-                token = re.findall(r"^(pass|exit)[ \t\n]*;", program[pos:])[0]
-                pos += len(token)
-                tokens.append(Token(token))
-            elif re.search(r"^[a-zA-Z][a-zA-Z0-9_]*", program[pos:]):
-                token = re.findall(r"^[a-zA-Z][a-zA-Z0-9_]*", program[pos:])[0]
-                pos += len(token)
-                tokens.append(Token("var", token))
-            elif re.search(r"^[0-9]+", program[pos:]):
-                token = re.findall(r"^[0-9]+", program[pos:])[0]
-                pos += len(token)
-                tokens.append(Token("num", token))
-            elif re.search(r"^(<|>|==|!=|\+|\-|\*|\/|\(|\)|=|;|{|})", program[pos:]):
-                token = re.findall(r"^(<|>|==|!=|\+|\-|\*|\/|\(|\)|=|;|{|})", program[pos:])[0]
-                pos += len(token)
+            elif match := Lexer.KEYWORD_EXPR.match(program, pos):
+                tokens.append(Token(match[1], pos=pos))
+                pos += len(match[1])
+            elif match := Lexer.KEYWORD_STMTS.match(program, pos):
+                tokens.append(Token(match[1], pos=pos))
+                pos += len(match[1])
+            elif match := Lexer.KEYWORD_STMT.match(program, pos):
+                tokens.append(Token(match[1], pos=pos))
+                pos += len(match[1])
+            elif match := Lexer.VAR.match(program, pos):
+                tokens.append(Token("var", match[0], pos))
+                pos += len(match[0])
+            elif match := Lexer.NUM.match(program, pos):
+                tokens.append(Token("num", match[0], pos))
+                pos += len(match[0])
+            elif match := Lexer.OP.match(program, pos):
+                token = match[0]
 
                 if token in "+-":
                     if len(tokens) == 0 or tokens[-1] not in (TokenEnum.VAR, TokenEnum.NUM):
                         token += "u"
 
-                tokens.append(Token(token))
+                tokens.append(Token(token, pos=pos))
+                pos += len(match[0])
             else:
-                raise SyntaxError("Invalid program syntax: " + program)
+                error = SourceSyntaxError("Invalid program syntax", pos, pos + 1, program)
+                if errors is None:
+                    raise error
+
+                errors.append(error)
+                pos += 1
 
         return tuple(tokens)
 
@@ -115,7 +185,7 @@ class Lexer:
     @staticmethod
     def rp_idx(tokens: tuple[Token]) -> int:
         if tokens[0] not in (TokenEnum.LP, TokenEnum.LP_STMT):
-            raise SyntaxError("Invalid parenthesis syntax: " + Lexer.detokenize(tokens))
+            raise SourceSyntaxError.from_tokens("Invalid parenthesis syntax", tokens)
 
         level = 0
         lp = tokens[0]
@@ -133,12 +203,12 @@ class Lexer:
             if level == 0:
                 return idx
 
-        raise SyntaxError("Invalid parenthesis syntax: " + Lexer.detokenize(tokens))
+        raise SourceSyntaxError.from_tokens("Invalid parenthesis syntax", tokens)
 
     @staticmethod
     def lp_idx(tokens: tuple[Token]) -> int:
         if tokens[-1] not in (TokenEnum.RP, TokenEnum.RP_STMT):
-            raise SyntaxError("Invalid parenthesis syntax: " + Lexer.detokenize(tokens))
+            raise SourceSyntaxError.from_tokens("Invalid parenthesis syntax", tokens)
 
         level = 0
         rp = tokens[-1]
@@ -156,4 +226,4 @@ class Lexer:
             if level == 0:
                 return idx
 
-        raise SyntaxError("Invalid parenthesis syntax: " + Lexer.detokenize(tokens))
+        raise SourceSyntaxError.from_tokens("Invalid parenthesis syntax", tokens)
@@ -1,6 +1,20 @@
-from lexer import Lexer
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
+
+from lexer import Lexer, SourceSyntaxError
 from parser import Parser
 from compiler import Compiler
+from tracer import TraceBuffer
 from virtual_machine import VirtualMachine
 
 
@@ -124,18 +138,238 @@ def test_virtual_machine() -> None:
     vm.run(program_code)
 
 
-def run_program(program: str) -> None:
+def test_check() -> None:
+    program = """a = 1;
+while (a < 2) { c = ; d = 2; }
+if (a) { x = (; } else { y = ; }
+b = 2 $ 3;
+while (a) { e = ;
+f = ;
+"""
+
+    errors = check_program(program)
+    for error in errors:
+        print(error)
+
+    assert [(error.msg, error.position) for error in errors] == [
+        ("Invalid expression syntax", (2, 17)),
+        ("Invalid parenthesis syntax", (3, 14)),
+        ("Invalid expression syntax", (3, 26)),
+        ("Invalid program syntax", (4, 7)),
+        ("Invalid parenthesis syntax", (5, 11)),
+        ("Invalid expression syntax", (5, 13)),
+        ("Invalid expression syntax", (6, 1)),
+    ]
+    assert errors[0].span == "c = ;"
+
+    program, _ = test_program()
+    assert check_program(program) == ()
+
+    lexer = Lexer()
+    parser = Parser()
+    for program, valid in (
+        (program, True),
+        ("a = 1;", True),
+        ("if (a) { pass; } else { while (a) { a = a - 1; } }", True),
+        ("", False),
+        ("a = 1 { b = 2;", False),
+        ("x = 1 {\n y = 2;\n z = 3;", False),
+        ("while (a) { pass; } else { pass; }", False),
+        ("a = 1; }", False),
+        ("a = 1}", False),
+        ("if (a) {}", False),
+        ("if (a) x { pass; }", False),
+        ("if (a) { pass; } b = 1;", True),
+    ):
+        try:
+            parser.parse_program(lexer.tokenize(program))
+            compiled = True
+        except SyntaxError:
+            compiled = False
+
+        assert compiled == valid, program
+        assert (check_program(program) == ()) == valid, program
+
+
+def test_trace() -> None:
+    program = """
+    a = 2;
+    i = 0;
+    while (i < 12) {
+        a = a * a;
+        i = i + 1;
+    }
+    j = 1234567;
+    k = 1234567 / 3;
+    exit;
+    """
+
+    lexer = Lexer()
+    parser = Parser()
+    compiler = Compiler()
+    program_code = compiler.compile_program(parser.parse_program(lexer.tokenize(program)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.bin")
+        trace = TraceBuffer(64, path, program, tuple(compiler.source_map))
+
+        vm = VirtualMachine()
+        vm.run(program_code, trace)
+
+        replay = TraceBuffer.load(path).replay()
+
+    for line in replay[-8:]:
+        print(line)
+
+    assert replay == trace.replay()
+    assert any(" a=<overflow>" in line for line in replay)
+    assert any(" j=1234567\t| j = 1234567;" in line for line in replay)
+    assert any(f" k={1234567 / 3!r}" in line for line in replay)
+    assert " HALT " in replay[-1]
+
+
+def bench_trace(n: int = 200000) -> float:
+    program = f"i = 0; s = 0; while (i < {n}) {{ s = s + i * 2; i = i + 1; }} exit;"
+
+    lexer = Lexer()
+    parser = Parser()
+    compiler = Compiler()
+    program_code = compiler.compile_program(parser.parse_program(lexer.tokenize(program)))
+
+    timings = []
+    for trace in (None, TraceBuffer()):
+        vm = VirtualMachine()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            vm.run(program_code, trace)
+        timings.append(time.perf_counter() - start)
+
+    ratio = timings[1] / timings[0]
+    print(f"untraced: {timings[0]:.3f}s, traced: {timings[1]:.3f}s, overhead: {ratio:.2f}x")
+    return ratio
+
+
+def run_program(program: str, trace_path: str | None = None, trace_size: int = 4096) -> None:
     lexer = Lexer()
     tokens = lexer.tokenize(program)
 
     parser = Parser()
-    ast = parser.parse_program(tokens)
+    try:
+        ast = parser.parse_program(tokens)
+    except SourceSyntaxError as error:
+        error.source = program
+        raise
 
     compiler = Compiler()
     bytecode = compiler.compile_program(ast)
 
+    trace = None
+    if trace_path is not None:
+        trace = TraceBuffer(trace_size, trace_path, program, tuple(compiler.source_map))
+
     vm = VirtualMachine()
-    vm.run(bytecode)
+    vm.run(bytecode, trace)
+
+
+def check_program(program: str) -> tuple[SourceSyntaxError]:
+    errors = []
+    lexer = Lexer()
+    tokens = lexer.tokenize(program, errors)
+
+    parser = Parser()
+    for error in parser.check_program(tokens):
+        error.source = program
+        errors.append(error)
+
+    return tuple(sorted(errors, key=lambda error: error.start or 0))
+
+
+def check_source(source: tuple[str, str | Exception]) -> tuple[str, tuple[str]]:
+    name, program = source
+    if isinstance(program, Exception):
+        return name, (f"{name}: {program}",)
+
+    try:
+        return name, tuple(f"{name}: {error}" for error in check_program(program))
+    except Exception as error:
+        return name, (f"{name}: {type(error).__name__}: {error}",)
+
+
+def check_batch(sources: tuple[tuple[str, str | Exception]]) -> tuple[tuple[str, tuple[str]]]:
+    return tuple(map(check_source, sources))
+
+
+def decode_source(data: bytes) -> str | Exception:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError as error:
+        return error
+
+
+def read_source(path: str) -> str | Exception:
+    try:
+        with open(path, "rb") as f:
+            return decode_source(f.read())
+    except OSError as error:
+        return error
+
+
+def read_stdin_sources() -> Iterator[tuple[str, str | Exception]]:
+    idx = 0
+    buffer = b""
+    while chunk := sys.stdin.buffer.read1(65536):
+        *programs, buffer = (buffer + chunk).split(b"\0")
+        for program in programs:
+            idx += 1
+            yield f"<stdin#{idx}>", decode_source(program)
+
+    if buffer or idx == 0:
+        yield f"<stdin#{idx + 1}>", decode_source(buffer)
+
+
+def read_sources(paths: Iterable[str]) -> Iterator[tuple[str, str | Exception]]:
+    for path in paths:
+        if path == "-":
+            yield from read_stdin_sources()
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file in sorted(files):
+                    yield os.path.join(root, file), read_source(os.path.join(root, file))
+        else:
+            yield path, read_source(path)
+
+
+def check_sources(
+    sources: Iterable[tuple[str, str | Exception]], workers: int | None = None, chunksize: int = 64
+) -> bool:
+    count = 0
+    failed = 0
+    start = time.perf_counter()
+
+    workers = workers or os.cpu_count() or 1
+    sources = iter(sources)
+    pending = deque()
+
+    with ProcessPoolExecutor(workers) as executor:
+        while pending or sources is not None:
+            if sources is not None and len(pending) < workers * 4:
+                if batch := tuple(islice(sources, chunksize)):
+                    pending.append(executor.submit(check_batch, batch))
+                else:
+                    sources = None
+                continue
+
+            for _, errors in pending.popleft().result():
+                count += 1
+                if errors:
+                    failed += 1
+                    print("\n".join(errors))
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Checked {count} programs, {failed} failed, {elapsed:.3f}s ({rate:.1f} programs/sec).")
+    return failed == 0
 
 
 def main() -> None:
@@ -143,9 +377,30 @@ def main() -> None:
     # test_parser()
     # test_compiler()
     # test_virtual_machine()
+    # test_check()
+    # test_trace()
+    # bench_trace()
+
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument(
+        "--check", nargs="+", metavar="PATH", help="validate programs only, '-' reads NUL-separated programs from stdin"
+    )
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--trace", metavar="PATH", help="record an execution trace and dump it to PATH")
+    arg_parser.add_argument("--trace-size", type=int, default=4096)
+    arg_parser.add_argument("--replay", metavar="PATH", help="print the last steps of a dumped trace")
+    arg_parser.add_argument("--last", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check_sources(read_sources(args.check), args.workers) else 1)
+
+    if args.replay:
+        print("\n".join(TraceBuffer.load(args.replay).replay(args.last)))
+        return
 
     program, _ = test_program()
-    run_program(program)
+    run_program(program, args.trace, args.trace_size)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from lexer import Lexer, Token, TokenEnum
+from lexer import Lexer, SourceSyntaxError, Token, TokenEnum
 
 
 class Node:
@@ -7,6 +7,13 @@ class Node:
         self.op1 = op1
         self.op2 = op2
         self.op3 = op3
+        self.start = None
+        self.end = None
+
+    def locate(self, tokens: tuple[Token]) -> "Node":
+        self.start = tokens[0].pos
+        self.end = tokens[-1].end
+        return self
 
     def __repr__(self) -> str:
         if self.op2 and self.op3:
@@ -20,7 +27,7 @@ class Node:
 class Parser:
     def parse_unary(self, tokens: tuple[Token]) -> Node:
         if not tokens:
-            raise SyntaxError("Invalid unary expression syntax: " + Lexer.detokenize(tokens))
+            raise SourceSyntaxError.from_tokens("Invalid unary expression syntax", tokens)
 
         if tokens[0] in (TokenEnum.U_ADD, TokenEnum.U_SUB):
             return Node(tokens[0].token, self.parse_expr(tokens[1:]))
@@ -28,7 +35,7 @@ class Parser:
         if tokens[0] in (TokenEnum.NUM, TokenEnum.VAR):
             return Node(tokens[0].token, tokens[0].value)
 
-        raise SyntaxError("Invalid unary expression syntax: " + Lexer.detokenize(tokens))
+        raise SourceSyntaxError.from_tokens("Invalid unary expression syntax", tokens)
 
     def parse_binary(self, tokens: tuple[Token], ops: tuple[TokenEnum]) -> Node | None:
         if len(tokens) < 3:
@@ -41,7 +48,7 @@ class Parser:
 
             if tokens[idx] in ops:
                 if idx == 0:
-                    raise SyntaxError("Invalid binary expression syntax: " + Lexer.detokenize(tokens))
+                    raise SourceSyntaxError.from_tokens("Invalid binary expression syntax", tokens)
                 return Node(
                     tokens[idx].token,
                     self.parse_expr(tokens[:idx]),
@@ -54,7 +61,7 @@ class Parser:
 
     def parse_expr(self, tokens: tuple[Token]) -> Node:
         if not tokens:
-            raise SyntaxError("Invalid expression syntax: " + Lexer.detokenize(tokens))
+            raise SourceSyntaxError.from_tokens("Invalid expression syntax", tokens)
 
         if node := self.parse_binary(tokens, (TokenEnum.LT, TokenEnum.GT, TokenEnum.EQ, TokenEnum.NEQ)):
             return node
@@ -74,66 +81,67 @@ class Parser:
 
     def parse_stmt(self, tokens: tuple[Token]) -> Node:
         if len(tokens) < 2:
-            raise SyntaxError("Invalid stmt syntax: " + Lexer.detokenize(tokens))
+            raise SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens)
 
         if tokens[0] in (TokenEnum.PASS, TokenEnum.EXIT) and tokens[1] == TokenEnum.END_STMT:
-            return Node(tokens[0].token, None)
+            return Node(tokens[0].token, None).locate(tokens)
 
         if len(tokens) < 3:
-            raise SyntaxError("Invalid stmt syntax: " + Lexer.detokenize(tokens))
+            raise SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens)
 
         if tokens[1] == TokenEnum.ASSIGN and tokens[0] == TokenEnum.VAR and tokens[-1] == TokenEnum.END_STMT:
-            return Node(tokens[1].token, Node(tokens[0].token, tokens[0].value), self.parse_expr(tokens[2:-1]))
+            var = Node(tokens[0].token, tokens[0].value)
+            return Node(tokens[1].token, var, self.parse_expr(tokens[2:-1])).locate(tokens)
         elif tokens[0] == TokenEnum.WHILE and tokens[1] == TokenEnum.LP and tokens[-1] == TokenEnum.RP_STMT:
             expr_open_idx = 1
             expr_close_idx = expr_open_idx + Lexer.rp_idx(tokens[expr_open_idx:])
             expr_tree = self.parse_expr(tokens[expr_open_idx + 1 : expr_close_idx])
 
-            stmts_open_idx = tokens.index(TokenEnum.LP_STMT, expr_close_idx)
+            stmts_open_idx = expr_close_idx + 1
+            if tokens[stmts_open_idx] != TokenEnum.LP_STMT:
+                raise SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens)
+
             stmts_close_idx = stmts_open_idx + Lexer.rp_idx(tokens[stmts_open_idx:])
-            stmts = self.parse_stmts(tokens[stmts_open_idx + 1 : stmts_close_idx])
-            stmts_tree = []
-            for stmt in stmts:
-                stmts_tree.append(self.parse_stmt(stmt))
+            if stmts_close_idx != len(tokens) - 1:
+                raise SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens[stmts_close_idx + 1 :])
 
-            return Node(tokens[0].token, expr_tree, tuple(stmts_tree))
+            stmts_tree = self.parse_block(tokens[stmts_open_idx + 1 : stmts_close_idx])
+            return Node(tokens[0].token, expr_tree, stmts_tree).locate(tokens)
         elif tokens[0] == TokenEnum.IF and tokens[1] == TokenEnum.LP and tokens[-1] == TokenEnum.RP_STMT:
             expr_open_idx = 1
             expr_close_idx = expr_open_idx + Lexer.rp_idx(tokens[expr_open_idx:])
             expr_tree = self.parse_expr(tokens[expr_open_idx + 1 : expr_close_idx])
 
-            if_stmts_open_idx = tokens.index(TokenEnum.LP_STMT, expr_close_idx)
+            if_stmts_open_idx = expr_close_idx + 1
+            if tokens[if_stmts_open_idx] != TokenEnum.LP_STMT:
+                raise SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens)
+
             if_stmts_close_idx = if_stmts_open_idx + Lexer.rp_idx(tokens[if_stmts_open_idx:])
-            if_stmts = self.parse_stmts(tokens[if_stmts_open_idx + 1 : if_stmts_close_idx])
-            if_stmts_tree = []
-            for stmt in if_stmts:
-                if_stmts_tree.append(self.parse_stmt(stmt))
+            if_stmts_tree = self.parse_block(tokens[if_stmts_open_idx + 1 : if_stmts_close_idx])
 
-            if len(tokens) == if_stmts_close_idx + 1 or tokens[if_stmts_close_idx + 1] != TokenEnum.ELSE:
-                return Node(tokens[0].token, expr_tree, tuple(if_stmts_tree))
+            if len(tokens) == if_stmts_close_idx + 1:
+                return Node(tokens[0].token, expr_tree, if_stmts_tree).locate(tokens)
 
             else_tokens = tokens[if_stmts_close_idx + 1 :]
-            if (
-                else_tokens[0] != TokenEnum.ELSE
-                or else_tokens[1] != TokenEnum.LP_STMT
-                or else_tokens[-1] != TokenEnum.RP_STMT
-            ):
-                raise SyntaxError("Invalid stmt syntax: " + Lexer.detokenize(tokens))
+            if len(else_tokens) < 2 or else_tokens[0] != TokenEnum.ELSE or else_tokens[1] != TokenEnum.LP_STMT:
+                raise SourceSyntaxError.from_tokens("Invalid stmt syntax", else_tokens)
 
             else_stmts_open_idx = 1
             else_stmts_close_idx = else_stmts_open_idx + Lexer.rp_idx(else_tokens[else_stmts_open_idx:])
-            else_stmts = self.parse_stmts(else_tokens[else_stmts_open_idx + 1 : else_stmts_close_idx])
-            else_stmts_tree = []
-            for stmt in else_stmts:
-                else_stmts_tree.append(self.parse_stmt(stmt))
+            if else_stmts_close_idx != len(else_tokens) - 1:
+                raise SourceSyntaxError.from_tokens("Invalid stmt syntax", else_tokens[else_stmts_close_idx + 1 :])
 
-            return Node(else_tokens[0].token, expr_tree, tuple(if_stmts_tree), tuple(else_stmts_tree))
+            else_stmts_tree = self.parse_block(else_tokens[else_stmts_open_idx + 1 : else_stmts_close_idx])
+            return Node(else_tokens[0].token, expr_tree, if_stmts_tree, else_stmts_tree).locate(tokens)
 
-        raise SyntaxError("Invalid stmt syntax: " + Lexer.detokenize(tokens))
+        raise SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens)
 
     def parse_stmts(self, tokens: tuple[Token]) -> tuple[tuple[Token]]:
+        if not tokens:
+            raise SourceSyntaxError("Invalid stmts syntax")
+
         if tokens[-1] not in (TokenEnum.END_STMT, TokenEnum.RP_STMT):
-            raise SyntaxError("Invalid stmts syntax: " + Lexer.detokenize(tokens))
+            raise SourceSyntaxError.from_tokens("Invalid stmts syntax", tokens)
 
         idx = 0
         stmts_idx = 0
@@ -162,12 +170,137 @@ class Parser:
 
             idx += 1
 
+        if stmts[stmts_idx]:
+            raise SourceSyntaxError.from_tokens("Invalid stmts syntax", tuple(stmts[stmts_idx]))
+
         del stmts[stmts_idx]
         return tuple(map(tuple, stmts))
 
-    def parse_program(self, tokens: tuple[Token]) -> tuple[Node]:
-        stmts = self.parse_stmts(tokens)
+    def parse_block(self, tokens: tuple[Token]) -> tuple[Node]:
         ast = []
-        for stmt in stmts:
-            ast.append(self.parse_stmt(stmt))
+        for stmt in self.parse_stmts(tokens):
+            try:
+                ast.append(self.parse_stmt(stmt))
+            except SourceSyntaxError as error:
+                raise error.locate(stmt)
         return tuple(ast)
+
+    def parse_program(self, tokens: tuple[Token]) -> tuple[Node]:
+        return self.parse_block(tokens)
+
+    def recover_stmts(self, tokens: tuple[Token], errors: list[SourceSyntaxError]) -> tuple[tuple[Token]]:
+        level = 0
+        stmts = []
+        stmt = []
+
+        for idx, token in enumerate(tokens):
+            if token == TokenEnum.RP_STMT and level == 0:
+                errors.append(SourceSyntaxError.from_tokens("Invalid parenthesis syntax", (token,)))
+                continue
+
+            stmt.append(token)
+
+            if token == TokenEnum.LP_STMT:
+                level += 1
+            elif token == TokenEnum.RP_STMT:
+                level -= 1
+
+            if level > 0:
+                continue
+
+            if token == TokenEnum.END_STMT or (
+                token == TokenEnum.RP_STMT and (idx + 1 == len(tokens) or tokens[idx + 1] != TokenEnum.ELSE)
+            ):
+                stmts.append(tuple(stmt))
+                stmt = []
+
+        if stmt:
+            stmts.append(tuple(stmt))
+
+        return tuple(stmts)
+
+    def check_expr(self, tokens: tuple[Token], stmt: tuple[Token], errors: list[SourceSyntaxError]) -> None:
+        try:
+            self.parse_expr(tokens)
+        except SourceSyntaxError as error:
+            errors.append(error.locate(stmt))
+        except (IndexError, ValueError):
+            errors.append(SourceSyntaxError.from_tokens("Invalid expression syntax", stmt))
+
+    def check_block(self, tokens: tuple[Token], idx: int, errors: list[SourceSyntaxError]) -> int | None:
+        if idx >= len(tokens) or tokens[idx] != TokenEnum.LP_STMT:
+            errors.append(SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens[: idx + 1]))
+            return None
+
+        level = 0
+        for close_idx in range(idx, len(tokens)):
+            if tokens[close_idx] == TokenEnum.LP_STMT:
+                level += 1
+            elif tokens[close_idx] == TokenEnum.RP_STMT:
+                level -= 1
+
+            if level == 0:
+                break
+        else:
+            errors.append(SourceSyntaxError.from_tokens("Invalid parenthesis syntax", tokens[idx : idx + 1]))
+            self.check_stmts(tokens[idx + 1 :], errors)
+            return None
+
+        if close_idx == idx + 1:
+            errors.append(SourceSyntaxError.from_tokens("Invalid stmts syntax", tokens[idx : close_idx + 1]))
+        else:
+            self.check_stmts(tokens[idx + 1 : close_idx], errors)
+
+        return close_idx
+
+    def check_stmt(self, tokens: tuple[Token], errors: list[SourceSyntaxError]) -> None:
+        if tokens[0] not in (TokenEnum.WHILE, TokenEnum.IF):
+            for token in tokens:
+                if token in (TokenEnum.LP_STMT, TokenEnum.RP_STMT):
+                    errors.append(SourceSyntaxError.from_tokens("Invalid parenthesis syntax", (token,)))
+                    return
+
+            try:
+                self.parse_stmt(tokens)
+            except SourceSyntaxError as error:
+                errors.append(error.locate(tokens))
+            except (IndexError, ValueError):
+                errors.append(SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens))
+            return
+
+        if len(tokens) < 2 or tokens[1] != TokenEnum.LP:
+            errors.append(SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens))
+            return
+
+        try:
+            expr_close_idx = 1 + Lexer.rp_idx(tokens[1:])
+        except SourceSyntaxError:
+            errors.append(SourceSyntaxError.from_tokens("Invalid parenthesis syntax", tokens[1:2]))
+            if TokenEnum.LP_STMT not in tokens:
+                return
+            idx = tokens.index(TokenEnum.LP_STMT)
+        else:
+            self.check_expr(tokens[2:expr_close_idx], tokens[: expr_close_idx + 1], errors)
+            idx = expr_close_idx + 1
+
+        if (idx := self.check_block(tokens, idx, errors)) is None:
+            return
+
+        if tokens[0] == TokenEnum.IF and idx + 1 < len(tokens) and tokens[idx + 1] == TokenEnum.ELSE:
+            if (idx := self.check_block(tokens, idx + 2, errors)) is None:
+                return
+
+        if idx + 1 < len(tokens):
+            errors.append(SourceSyntaxError.from_tokens("Invalid stmt syntax", tokens[idx + 1 :]))
+
+    def check_stmts(self, tokens: tuple[Token], errors: list[SourceSyntaxError]) -> None:
+        for stmt in self.recover_stmts(tokens, errors):
+            self.check_stmt(stmt, errors)
+
+    def check_program(self, tokens: tuple[Token]) -> tuple[SourceSyntaxError]:
+        if not tokens:
+            return (SourceSyntaxError("Invalid stmts syntax"),)
+
+        errors = []
+        self.check_stmts(tokens, errors)
+        return tuple(sorted(errors, key=lambda error: error.start or 0))
@@ -0,0 +1,167 @@
+import struct
+
+from compiler import Command
+
+STORE = Command.STORE
+INT_MIN = -(2**63)
+INT_MAX = 2**63 - 1
+
+NONE = 0
+INT = 1
+FLOAT = 2
+OVERFLOW = 3
+
+
+class TraceBuffer:
+    MAGIC = b"VMTR"
+    HEADER = struct.Struct("<4sIQIII")
+    RECORD = struct.Struct("<IBiBqd")
+    SOURCE_MAP = struct.Struct("<IIii")
+
+    def __init__(
+        self,
+        size: int = 4096,
+        path: str | None = None,
+        source: str | None = None,
+        source_map: tuple[tuple[int, int, int | None, int | None]] = (),
+    ) -> None:
+        if size <= 0:
+            raise ValueError("size must be positive")
+
+        self.size = size
+        self.path = path
+        self.source = source
+        self.source_map = source_map
+        self.buffer = bytearray(size * self.RECORD.size)
+        self.count = 0
+        self.names = {}
+        self.offset = 0
+        self.step = self.RECORD.size
+        self.limit = len(self.buffer)
+        self.pack_into = self.RECORD.pack_into
+
+    def record(self, pc: int, op: Command, stack: list[int | float], arg: Command | int | str | None) -> None:
+        var = self.names.setdefault(arg, len(self.names)) if op is STORE else -1
+        offset = self.offset
+
+        if not stack:
+            self.pack_into(self.buffer, offset, pc, op._value_, var, NONE, 0, 0.0)
+        elif type(tos := stack[-1]) is int and INT_MIN <= tos <= INT_MAX:
+            self.pack_into(self.buffer, offset, pc, op._value_, var, INT, tos, 0.0)
+        elif type(tos) is float:
+            self.pack_into(self.buffer, offset, pc, op._value_, var, FLOAT, 0, tos)
+        else:
+            self.pack_into(self.buffer, offset, pc, op._value_, var, OVERFLOW, 0, 0.0)
+
+        self.count += 1
+        offset += self.step
+        self.offset = 0 if offset == self.limit else offset
+
+    @staticmethod
+    def format_value(tag: int, value: int | float | None) -> str:
+        if tag == NONE:
+            return "-"
+        elif tag == OVERFLOW:
+            return "<overflow>"
+
+        return repr(value)
+
+    def entries(self) -> tuple[tuple[int, Command, int, int | float | None, str | None]]:
+        names = {idx: name for name, idx in self.names.items()}
+        entries = []
+
+        for idx in range(max(0, self.count - self.size), self.count):
+            pc, op, var, tag, int_value, float_value = self.RECORD.unpack_from(
+                self.buffer, idx % self.size * self.RECORD.size
+            )
+            if tag == INT:
+                tos = int_value
+            elif tag == FLOAT:
+                tos = float_value
+            else:
+                tos = None
+            entries.append((pc, Command(op), tag, tos, names.get(var)))
+
+        return tuple(entries)
+
+    def stmt(self, pc: int) -> str | None:
+        if self.source is None:
+            return None
+
+        best = None
+        for pc_start, pc_end, start, end in self.source_map:
+            if start is None or not pc_start <= pc < pc_end:
+                continue
+            if best is None or pc_end - pc_start < best[1] - best[0]:
+                best = (pc_start, pc_end, start, end)
+
+        if best is None:
+            return None
+
+        return " ".join(self.source[best[2] : best[3]].split())
+
+    def replay(self, last: int | None = None) -> tuple[str]:
+        entries = self.entries()
+        if last is not None:
+            entries = entries[-last:] if last > 0 else ()
+
+        lines = []
+        for pc, op, tag, tos, var in entries:
+            tos = self.format_value(tag, tos)
+            line = f"{pc:03d}: {op.name:<5} tos={tos}"
+            if var is not None:
+                line += f" {var}={tos}"
+            if stmt := self.stmt(pc):
+                if len(stmt) > 40:
+                    stmt = stmt[:37] + "..."
+                line += f"\t| {stmt}"
+            lines.append(line)
+
+        return tuple(lines)
+
+    def dump(self, path: str | None = None) -> None:
+        path = path or self.path
+        if path is None:
+            return
+
+        names = "\n".join(self.names).encode()
+        source = (self.source or "").encode()
+
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.size, self.count, len(names), len(self.source_map), len(source)))
+            f.write(names)
+            for pc_start, pc_end, start, end in self.source_map:
+                start = -1 if start is None else start
+                end = -1 if end is None else end
+                f.write(self.SOURCE_MAP.pack(pc_start, pc_end, start, end))
+            f.write(source)
+            f.write(self.buffer)
+
+    @classmethod
+    def load(cls, path: str) -> "TraceBuffer":
+        with open(path, "rb") as f:
+            data = f.read()
+
+        magic, size, count, names_len, map_len, source_len = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("Invalid trace file: " + path)
+
+        pos = cls.HEADER.size
+        names = data[pos : pos + names_len].decode().split("\n") if names_len else []
+        pos += names_len
+
+        source_map = []
+        for _ in range(map_len):
+            pc_start, pc_end, start, end = cls.SOURCE_MAP.unpack_from(data, pos)
+            source_map.append((pc_start, pc_end, None if start < 0 else start, None if end < 0 else end))
+            pos += cls.SOURCE_MAP.size
+
+        source = data[pos : pos + source_len].decode() if source_len else None
+        pos += source_len
+
+        trace = cls(size, path, source, tuple(source_map))
+        trace.buffer[:] = data[pos : pos + size * cls.RECORD.size]
+        trace.count = count
+        trace.offset = count % size * cls.RECORD.size
+        trace.names = {name: idx for idx, name in enumerate(names)}
+        return trace